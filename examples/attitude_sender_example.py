@@ -52,20 +52,25 @@ Dependencies:
 - Pygame for GUI operations.
 - MAVSDK for drone control interfacing.
 - Python's `socket` library for UDP communication.
+- `udp_sender.py` for batched background transmission.
 - `control_packet.py` for formatting control commands.
 
 The code is designed to be clear and modifiable for different use cases, allowing adjustments to IP settings, control rates, and more directly within the script.
 """
 
 import socket
+import struct
 import pygame
 import sys
+import time
 from control_packet import ControlPacket, SetpointMode
+from udp_sender import UDPSender, tune_socket
 
 # Constants for communication and control
 UDP_IP = "127.0.0.1"
 UDP_PORT = 5005
 SEND_RATE = 0.1  # Packet send rate in seconds (10 Hz)
+RENDER_RATE = 30  # GUI refresh rate in frames per second, independent of SEND_RATE
 ROLL_PITCH_STEP = 2.0  # degrees step for roll and pitch
 YAW_RATE_STEP = 5.0  # degrees step for yaw
 THRUST_STEP = 0.02  # thrust step
@@ -88,31 +93,67 @@ RED = (255, 0, 0)
 
 # Setup UDP socket for sending commands
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+tune_socket(sock)
+sender = UDPSender(sock, (UDP_IP, UDP_PORT))  # Batches sends on a background thread
+
+# Preallocated attitude packet: constant fields are packed once at import and
+# only the attitude setpoint, timestamp and CRC are rewritten on each send
+_ATTITUDE_STRUCT = struct.Struct(">4d")
+_PACKET_BUFFER = bytearray(ControlPacket(
+    mode=SetpointMode.ATTITUDE_CONTROL,
+    enable_flag=True,
+    yaw_control_flag=True,
+    position=(0, 0, 0),  # Not used in attitude mode
+    velocity=(0, 0, 0),  # Not used in attitude mode
+    acceleration=(0, 0, 0),  # Not used in attitude mode
+    attitude=(0, 0, 0, 0),
+    attitude_rate=(0, 0, 0)
+).pack())
 
 def send_attitude(roll, pitch, yaw, thrust):
     """Send an attitude command to the drone."""
-    packet = ControlPacket(
-        mode=SetpointMode.ATTITUDE_CONTROL,
-        enable_flag=True,
-        yaw_control_flag=True,
-        position=(0, 0, 0),  # Not used in attitude mode
-        velocity=(0, 0, 0),  # Not used in attitude mode
-        acceleration=(0, 0, 0),  # Not used in attitude mode
-        attitude=(roll, pitch, yaw, thrust),
-        attitude_rate=(0, 0, 0)
-    )
-    packed_data = packet.pack()
-    sock.sendto(packed_data, (UDP_IP, UDP_PORT))
+    _ATTITUDE_STRUCT.pack_into(_PACKET_BUFFER, ControlPacket.ATTITUDE_OFFSET, roll, pitch, yaw, thrust)
+    ControlPacket.refresh_packed(_PACKET_BUFFER)
+    sender.send(_PACKET_BUFFER)
+
+# Rendered text surfaces keyed on (message, font, color), so static labels are rendered only once
+_TEXT_CACHE = {}
+_TEXT_CACHE_LIMIT = 256  # Cleared when full so changing command values cannot grow it unbounded
+
+def render_text(message, font=FONT, color=TEXT_COLOR):
+    """Returns the rendered surface for the given text, reusing a cached one when possible."""
+    key = (message, id(font), color)
+    surface = _TEXT_CACHE.get(key)
+    if surface is None:
+        if len(_TEXT_CACHE) >= _TEXT_CACHE_LIMIT:
+            _TEXT_CACHE.clear()
+        surface = _TEXT_CACHE[key] = font.render(message, True, color)
+    return surface
 
 def display_text(message, position, font=FONT, color=TEXT_COLOR):
     """Displays text on the Pygame screen at the given position."""
-    text = font.render(message, True, color)
-    screen.blit(text, position)
+    screen.blit(render_text(message, font, color), position)
+
+# Surface and screen area last drawn for each dynamic text line, keyed on position
+_drawn_text = {}
+
+def update_text(message, position, dirty, font=FONT, color=TEXT_COLOR):
+    """Redraws a dynamic text line only when it changed, appending the touched areas to dirty."""
+    surface = render_text(message, font, color)
+    previous = _drawn_text.get(position)
+    if previous is not None:
+        if previous[0] is surface:
+            return
+        screen.fill(BACKGROUND_COLOR, previous[1])
+        dirty.append(previous[1])
+    rect = screen.blit(surface, position)
+    dirty.append(rect)
+    _drawn_text[position] = (surface, rect)
 
 def display_footer():
     """Displays the footer with copyright information on the Pygame screen."""
     footer_text = "© 2024  GitHub: MAVSDK-Python-UDP-From-Stream | alireza787b"
-    text_surface = FOOTER_FONT.render(footer_text, True, FOOTER_COLOR)
+    text_surface = render_text(footer_text, FOOTER_FONT, FOOTER_COLOR)
     text_rect = text_surface.get_rect(center=(screen.get_width() // 2, screen.get_height() - 10))
     screen.blit(text_surface, text_rect)
 
@@ -122,17 +163,25 @@ class Button:
         self.text = text
         self.position = position
         self.size = size
+        self.rect = pygame.Rect(position, size)  # Collision and drawing run in pygame's C code
         self.action = action
         self.release_action = release_action
         self.color = (100, 100, 100)
         self.active = False
+        self._drawn_active = None
+        # The label never changes, so render it once instead of on every frame
+        self._label_surface = SMALL_FONT.render(text, True, TEXT_COLOR)
+        self._label_rect = self._label_surface.get_rect(center=self.rect.center)
 
     def draw(self, screen):
         color = (150, 150, 150) if self.active else self.color
-        pygame.draw.rect(screen, color, (*self.position, *self.size))
-        text_surface = SMALL_FONT.render(self.text, True, TEXT_COLOR)
-        text_rect = text_surface.get_rect(center=(self.position[0] + self.size[0] // 2, self.position[1] + self.size[1] // 2))
-        screen.blit(text_surface, text_rect)
+        pygame.draw.rect(screen, color, self.rect)
+        screen.blit(self._label_surface, self._label_rect)
+        self._drawn_active = self.active
+        return self.rect
+
+    def needs_redraw(self):
+        return self.active != self._drawn_active
 
     def click(self):
         self.active = True
@@ -144,12 +193,12 @@ class Button:
             self.release_action()
 
     def is_clicked(self, mouse_pos):
-        x, y = mouse_pos
-        return (self.position[0] <= x <= self.position[0] + self.size[0]) and (self.position[1] <= y <= self.position[1] + self.size[1])
+        return self.rect.collidepoint(mouse_pos)
 
 # Movement control variables
 roll, pitch, yaw, thrust = 0, 0, 0, 0.5  # Start with a neutral thrust value
 enabled = False
+running = False
 
 # Button actions
 def enable_control():
@@ -251,90 +300,147 @@ buttons = [
     Button('Yaw Right', (375, 220), (100, 50), check_enabled(yaw_right), check_and_reset(reset_yaw))
 ]
 
+# Buttons pressed since the last mouse release, so only these need releasing
+_active_buttons = []
+
+def quit_control():
+    global running
+    send_attitude(0, 0, 0, 0)  # Safety stop
+    running = False
+
+# Keyboard dispatch tables, built once instead of walking an if/elif chain per event
+_KEYMAP_ALWAYS = {
+    pygame.K_q: quit_control,
+    pygame.K_e: enable_control,
+    pygame.K_c: disable_control,
+    pygame.K_m: toggle_mode,
+    pygame.K_h: reset_control,
+}
+
+_KEYMAP_ENABLED = {
+    pygame.K_w: adjust_pitch_up,
+    pygame.K_s: adjust_pitch_down,
+    pygame.K_a: adjust_roll_left,
+    pygame.K_d: adjust_roll_right,
+    pygame.K_UP: increase_thrust,
+    pygame.K_DOWN: decrease_thrust,
+    pygame.K_LEFT: yaw_left,
+    pygame.K_RIGHT: yaw_right,
+}
+
+# Key releases, applied only in instant reset mode
+_KEYMAP_RESET = {
+    pygame.K_w: reset_pitch,
+    pygame.K_s: reset_pitch,
+    pygame.K_a: reset_roll,
+    pygame.K_d: reset_roll,
+    pygame.K_UP: reset_thrust,
+    pygame.K_DOWN: reset_thrust,
+    pygame.K_LEFT: reset_yaw,
+    pygame.K_RIGHT: reset_yaw,
+}
+
+def redraw_screen():
+    """Draws the full screen once; dynamic lines and buttons are then updated in place."""
+    screen.fill(BACKGROUND_COLOR)
+    display_text("MAVSDK Offboard Control: Attitude Control", (50, 20), font=FONT)
+    display_text("Press 'E' to enable, 'C' to cancel, 'M' to toggle mode, 'H' to hold, 'Q' to quit", (50, 50), font=SMALL_FONT)
+    display_text(f"IP: {UDP_IP}, Port: {UDP_PORT}, Rate: {SEND_RATE}s", (50, 550), font=SMALL_FONT)
+    display_footer()
+    _drawn_text.clear()
+    for button in buttons:
+        button.draw(screen)
+    pygame.display.flip()
+
 def main():
     """Main function to handle keyboard and mouse inputs for drone attitude control."""
-    global INCREMENTAL_MODE, roll, pitch, yaw, thrust
+    global INCREMENTAL_MODE, roll, pitch, yaw, thrust, running
     running = True
-    clock = pygame.time.Clock()
+    next_send = next_render = time.monotonic()
+    last_command = None
 
-    while running:
-        screen.fill(BACKGROUND_COLOR)
-        display_text("MAVSDK Offboard Control: Attitude Control", (50, 20), font=FONT)
-        display_text("Press 'E' to enable, 'C' to cancel, 'M' to toggle mode, 'H' to hold, 'Q' to quit", (50, 50), font=SMALL_FONT)
-        mode_text = "Incremental" if INCREMENTAL_MODE else "Instant Reset"
-        display_text(f"Mode: {mode_text}", (50, 80), font=SMALL_FONT)
-        if enabled:
-            display_text("Status: Enabled", (50, 100), font=SMALL_FONT, color=GREEN)
-        else:
-            display_text("Status: Disabled", (50, 100), font=SMALL_FONT, color=RED)
-        display_text(f"Current Command: Roll={roll:.2f}, Pitch={pitch:.2f}, Yaw={yaw:.2f}, Thrust={thrust:.2f}", (50, 500), font=SMALL_FONT)
-        display_text(f"IP: {UDP_IP}, Port: {UDP_PORT}, Rate: {SEND_RATE}s", (50, 550), font=SMALL_FONT)
-        display_footer()
+    # Only queue the events handled below, so mouse motion never reaches the event loop
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP,
+                              pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.VIDEOEXPOSE])
+
+    redraw_screen()
 
+    while running:
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_q:
-                    send_attitude(0, 0, 0, 0)  # Safety stop
-                    running = False
-                elif event.key == pygame.K_e:
-                    enable_control()
-                elif event.key == pygame.K_c:
-                    disable_control()
-                elif event.key == pygame.K_m:
-                    toggle_mode()
-                elif event.key == pygame.K_h:
-                    reset_control()
-
+                action = _KEYMAP_ALWAYS.get(event.key)
+                if action:
+                    action()
                 if enabled:
-                    if event.key == pygame.K_w:
-                        adjust_pitch_up()
-                    elif event.key == pygame.K_s:
-                        adjust_pitch_down()
-                    elif event.key == pygame.K_a:
-                        adjust_roll_left()
-                    elif event.key == pygame.K_d:
-                        adjust_roll_right()
-                    elif event.key == pygame.K_UP:
-                        increase_thrust()
-                    elif event.key == pygame.K_DOWN:
-                        decrease_thrust()
-                    elif event.key == pygame.K_LEFT:
-                        yaw_left()
-                    elif event.key == pygame.K_RIGHT:
-                        yaw_right()
+                    action = _KEYMAP_ENABLED.get(event.key)
+                    if action:
+                        action()
 
             elif event.type == pygame.KEYUP:
                 if not INCREMENTAL_MODE:
-                    if event.key in [pygame.K_w, pygame.K_s]:
-                        reset_pitch()
-                    elif event.key in [pygame.K_a, pygame.K_d]:
-                        reset_roll()
-                    elif event.key in [pygame.K_UP, pygame.K_DOWN]:
-                        reset_thrust()
-                    elif event.key in [pygame.K_LEFT, pygame.K_RIGHT]:
-                        reset_yaw()
+                    action = _KEYMAP_RESET.get(event.key)
+                    if action:
+                        action()
 
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_pos = pygame.mouse.get_pos()
                 for button in buttons:
                     if button.is_clicked(mouse_pos):
                         button.click()
+                        _active_buttons.append(button)
+                        break  # Buttons do not overlap
 
             elif event.type == pygame.MOUSEBUTTONUP:
-                for button in buttons:
+                for button in _active_buttons:
                     button.release()
+                _active_buttons.clear()
 
-        if enabled:
-            send_attitude(roll, pitch, yaw, thrust)
-
-        for button in buttons:
-            button.draw(screen)
-
-        pygame.display.flip()
-        clock.tick(1 / SEND_RATE)
+            elif event.type == pygame.VIDEOEXPOSE:
+                redraw_screen()
 
+        # Sends and frames run on separate monotonic schedules, so packets stay evenly spaced
+        # at SEND_RATE whatever the frame rate
+        now = time.monotonic()
+        if enabled:
+            if now >= next_send:
+                send_attitude(roll, pitch, yaw, thrust)
+                next_send += SEND_RATE
+                if next_send <= now:  # After a stall, skip the missed periods instead of sending a burst of stale setpoints
+                    next_send = now + SEND_RATE
+        else:
+            next_send = now
+
+        if now >= next_render:
+            next_render = max(next_render + 1 / RENDER_RATE, now)
+            # Only redraw and upload the regions that changed since the last frame
+            dirty = []
+            mode_text = "Incremental" if INCREMENTAL_MODE else "Instant Reset"
+            update_text(f"Mode: {mode_text}", (50, 80), dirty, font=SMALL_FONT)
+            if enabled:
+                update_text("Status: Enabled", (50, 100), dirty, font=SMALL_FONT, color=GREEN)
+            else:
+                update_text("Status: Disabled", (50, 100), dirty, font=SMALL_FONT, color=RED)
+            command = (roll, pitch, yaw, thrust)
+            if command != last_command:  # Only reformat the command line when a value changed
+                command_text = f"Current Command: Roll={roll:.2f}, Pitch={pitch:.2f}, Yaw={yaw:.2f}, Thrust={thrust:.2f}"
+                last_command = command
+            update_text(command_text, (50, 500), dirty, font=SMALL_FONT)
+
+            for button in buttons:
+                if button.needs_redraw():
+                    dirty.append(button.draw(screen))
+
+            if dirty:
+                pygame.display.update(dirty)
+
+        # Sleep until the next send or frame is due, whichever comes first
+        deadline = min(next_send, next_render) if enabled else next_render
+        time.sleep(max(0.0, deadline - time.monotonic()))
+
+    sender.close()
     sock.close()
     pygame.quit()
 
@@ -88,6 +88,25 @@ class ControlPacket:
     DATA_FORMAT = ">QIII3d3d3d4d3d"  # Updated format to include all required fields
     CRC_FORMAT = ">I"  # 4 bytes for CRC
 
+    # Formats compiled once at import so packing does not re-parse them on every call
+    HEADER_STRUCT = struct.Struct(HEADER_FORMAT)
+    DATA_STRUCT = struct.Struct(DATA_FORMAT)
+    CRC_STRUCT = struct.Struct(CRC_FORMAT)
+    TIMESTAMP_STRUCT = struct.Struct(">Q")
+    HEADER_BYTES = HEADER_STRUCT.pack(HEADER)
+
+    # Byte offsets of fields inside a fully packed packet (header included),
+    # used by senders that patch a preallocated buffer instead of repacking
+    PAYLOAD_OFFSET = HEADER_STRUCT.size
+    TIMESTAMP_OFFSET = PAYLOAD_OFFSET
+    ENABLE_FLAG_OFFSET = PAYLOAD_OFFSET + struct.calcsize(">QI")  # Followed by the yaw control flag
+    POSITION_OFFSET = PAYLOAD_OFFSET + struct.calcsize(">QIII")
+    VELOCITY_OFFSET = POSITION_OFFSET + struct.calcsize(">3d")
+    ACCELERATION_OFFSET = VELOCITY_OFFSET + struct.calcsize(">3d")
+    ATTITUDE_OFFSET = ACCELERATION_OFFSET + struct.calcsize(">3d")
+    ATTITUDE_RATE_OFFSET = ATTITUDE_OFFSET + struct.calcsize(">4d")
+    CRC_OFFSET = PAYLOAD_OFFSET + DATA_STRUCT.size
+
     def __init__(self, mode, enable_flag, yaw_control_flag, position, velocity, acceleration, attitude, attitude_rate, timestamp=None):
         self.timestamp = timestamp if timestamp is not None else int(time.time() * 1e9)
         self.setpoint_flags = mode.value
@@ -109,8 +128,7 @@ class ControlPacket:
 
         # Pack all data components
         try:
-            payload = struct.pack(
-                self.DATA_FORMAT,
+            payload = self.DATA_STRUCT.pack(
                 timestamp_int,
                 self.setpoint_flags,
                 enable_flag_int,
@@ -127,17 +145,26 @@ class ControlPacket:
             raise
 
         crc = zlib.crc32(payload) & 0xffffffff
-        return struct.pack(self.HEADER_FORMAT, self.HEADER) + payload + struct.pack(self.CRC_FORMAT, crc)
+        return self.HEADER_BYTES + payload + self.CRC_STRUCT.pack(crc)
 
+    @staticmethod
+    def refresh_packed(buffer, timestamp=None):
+        """Restamp and recompute the CRC of a packed packet whose setpoints were patched in place."""
+        timestamp = timestamp if timestamp is not None else int(time.time() * 1e9)
+        ControlPacket.TIMESTAMP_STRUCT.pack_into(buffer, ControlPacket.TIMESTAMP_OFFSET, timestamp)
+        payload = memoryview(buffer)[ControlPacket.PAYLOAD_OFFSET:ControlPacket.CRC_OFFSET]
+        crc = zlib.crc32(payload) & 0xffffffff
+        payload.release()
+        ControlPacket.CRC_STRUCT.pack_into(buffer, ControlPacket.CRC_OFFSET, crc)
 
     @staticmethod
     def unpack(packet):
-        header = struct.unpack(ControlPacket.HEADER_FORMAT, packet[:8])[0]
+        header = ControlPacket.HEADER_STRUCT.unpack(packet[:8])[0]
         if header != ControlPacket.HEADER:
             raise ValueError("Invalid packet header")
         payload, crc = packet[8:-4], packet[-4:]
-        data = struct.unpack(ControlPacket.DATA_FORMAT, payload)
-        if crc != struct.pack(ControlPacket.CRC_FORMAT, zlib.crc32(payload) & 0xffffffff):
+        data = ControlPacket.DATA_STRUCT.unpack(payload)
+        if crc != ControlPacket.CRC_STRUCT.pack(zlib.crc32(payload) & 0xffffffff):
             raise ValueError("CRC check failed")
 
         timestamp, setpoint_flags, enable_flag_int, yaw_control_flag_int = data[:4]
@@ -39,6 +39,7 @@ ControlPacket structure.
 
 """
 import socket
+import struct
 import sys
 import time
 import select
@@ -54,23 +55,37 @@ CIRCLE_SPEED = 0.1  # Speed of circular motion in radians per second
 UDP_IP = "127.0.0.1"
 UDP_PORT = 5005
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
+sock.connect((UDP_IP, UDP_PORT))  # Fix the destination once so each send skips address resolution
+
+
+# Preallocated position packet: constant fields are packed once at import and
+# only the flags, setpoint, yaw, timestamp and CRC are rewritten on each send
+_FLAGS_STRUCT = struct.Struct(">II")
+_POSITION_STRUCT = struct.Struct(">3d")
+_YAW_STRUCT = struct.Struct(">d")
+_YAW_OFFSET = ControlPacket.ATTITUDE_OFFSET + struct.calcsize(">2d")
+_PACKET_BUFFER = bytearray(ControlPacket(
+    mode=SetpointMode.POSITION_LOCAL_NED,
+    enable_flag=True,
+    yaw_control_flag=True,
+    position=(0, 0, 0),
+    velocity=(0, 0, 0),
+    acceleration=(0, 0, 0),
+    attitude=(0, 0, 0, 0.5),
+    attitude_rate=(0, 0, 0)
+).pack())
 
 def send_position_ned(n, e, d, yaw, yaw_control_flag, enabled=True):
     """Creates a control packet with specified position and yaw control settings."""
     """Sends a packed control packet over UDP. Displays packet details if debugging is enabled."""
-    packet =  ControlPacket(
-        mode=SetpointMode.POSITION_LOCAL_NED,
-        enable_flag=enabled,
-        yaw_control_flag=yaw_control_flag,
-        position=(n, e, d),
-        velocity=(0, 0, 0),
-        acceleration=(0, 0, 0),
-        attitude=(0, 0, yaw, 0.5),  
-        attitude_rate=(0, 0, 0)
-    )
-    packed_data = packet.pack()
-    sock.sendto(packed_data, (UDP_IP, UDP_PORT))
+    _FLAGS_STRUCT.pack_into(_PACKET_BUFFER, ControlPacket.ENABLE_FLAG_OFFSET, int(bool(enabled)), int(bool(yaw_control_flag)))
+    _POSITION_STRUCT.pack_into(_PACKET_BUFFER, ControlPacket.POSITION_OFFSET, n, e, d)
+    _YAW_STRUCT.pack_into(_PACKET_BUFFER, _YAW_OFFSET, yaw)
+    ControlPacket.refresh_packed(_PACKET_BUFFER)
+    try:
+        sock.send(_PACKET_BUFFER)
+    except ConnectionRefusedError:
+        pass  # Receiver not listening yet; keep streaming setpoints
 
 def main():
     """Main function to handle user inputs and send UDP packets with setpoints."""
@@ -0,0 +1,181 @@
+"""
+UDPSender Module for Control Packet Transmission
+================================================
+
+Overview:
+---------
+This module provides the UDPSender class, which moves the UDP transmission of
+packed control packets off the caller's thread. Packets are queued by the GUI or
+control loop and drained by a daemon thread, so send cadence is no longer coupled
+to rendering or input handling jitter.
+
+On Linux, queued packets are flushed in batches with a single `sendmmsg()` call
+(through `ctypes`), amortizing the per-packet syscall cost when the send rate is
+raised. On other platforms the sender falls back to one `send()` per packet.
+
+The socket is connected to the destination and can be tuned for low-latency
+traffic with `tune_socket()` (larger send buffer, IPTOS_LOWDELAY, SO_PRIORITY).
+
+Usage:
+------
+```python
+sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+tune_socket(sock)
+sender = UDPSender(sock, ("127.0.0.1", 5005))
+sender.send(packet.pack())
+...
+sender.close()  # Flushes pending packets before returning
+```
+"""
+import collections
+import ctypes
+import errno
+import os
+import socket
+import sys
+import threading
+
+BATCH_SIZE = 16  # Maximum number of packets flushed per sendmmsg call
+MAX_PACKET_SIZE = 1024  # Size of each preallocated send slot in bytes
+
+# Socket tuning for low-latency control traffic
+SEND_BUFFER_SIZE = 1 << 20  # Large enough that sends never block on a full buffer
+IPTOS_LOWDELAY = 0x10
+SOCKET_PRIORITY = 6  # Highest priority settable without CAP_NET_ADMIN (Linux only)
+IP_MTU_DISCOVER = 10  # Linux <netinet/in.h> values, not exported by the socket module
+IP_PMTUDISC_DONT = 0
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p),
+                ("iov_len", ctypes.c_size_t)]
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [("msg_name", ctypes.c_void_p),
+                ("msg_namelen", ctypes.c_uint32),
+                ("msg_iov", ctypes.POINTER(_IOVec)),
+                ("msg_iovlen", ctypes.c_size_t),
+                ("msg_control", ctypes.c_void_p),
+                ("msg_controllen", ctypes.c_size_t),
+                ("msg_flags", ctypes.c_int)]
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr),
+                ("msg_len", ctypes.c_uint)]
+
+def _load_sendmmsg():
+    """Return libc's sendmmsg function, or None where it is not available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        sendmmsg = ctypes.CDLL("libc.so.6", use_errno=True).sendmmsg
+    except (OSError, AttributeError):
+        return None
+    sendmmsg.argtypes = [ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int]
+    sendmmsg.restype = ctypes.c_int
+    return sendmmsg
+
+_sendmmsg = _load_sendmmsg()
+
+def tune_socket(sock):
+    """Configure a UDP socket for low-latency control traffic, skipping options the platform rejects."""
+    options = [
+        (socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE),
+        (socket.IPPROTO_IP, socket.IP_TOS, IPTOS_LOWDELAY),
+    ]
+    if sys.platform.startswith("linux"):
+        options += [
+            (socket.SOL_SOCKET, socket.SO_PRIORITY, SOCKET_PRIORITY),
+            (socket.IPPROTO_IP, IP_MTU_DISCOVER, IP_PMTUDISC_DONT),
+        ]
+    for level, option, value in options:
+        try:
+            sock.setsockopt(level, option, value)
+        except OSError as e:
+            print(f"Socket option {option} not applied: {e}")
+
+class UDPSender:
+    """Background UDP sender that batches queued packets into as few syscalls as possible."""
+
+    def __init__(self, sock, address, batch_size=BATCH_SIZE):
+        # Connecting a UDP socket lets the kernel cache the route instead of resolving it per packet
+        sock.connect(address)
+        self.sock = sock
+        self.address = address
+        self.batch_size = batch_size
+        # Only the most recent setpoints matter, so older packets are dropped if the ring fills up
+        self._queue = collections.deque(maxlen=batch_size)
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+        if _sendmmsg is not None:
+            self._setup_batch_buffers()
+
+        self._thread = threading.Thread(target=self._run, name="udp-sender", daemon=True)
+        self._thread.start()
+
+    def _setup_batch_buffers(self):
+        """Build the sendmmsg message vector once so every flush reuses the same memory."""
+        self._slots = [ctypes.create_string_buffer(MAX_PACKET_SIZE) for _ in range(self.batch_size)]
+        self._iovecs = (_IOVec * self.batch_size)()
+        self._msgvec = (_MMsgHdr * self.batch_size)()
+        for i in range(self.batch_size):
+            self._iovecs[i].iov_base = ctypes.addressof(self._slots[i])
+            # msg_name stays NULL: the socket is connected, so no address is copied in per message
+            msg_hdr = self._msgvec[i].msg_hdr
+            msg_hdr.msg_iov = ctypes.pointer(self._iovecs[i])
+            msg_hdr.msg_iovlen = 1
+
+    def send(self, packet):
+        """Queue a packed packet for transmission; returns immediately."""
+        if len(packet) > MAX_PACKET_SIZE:
+            raise ValueError(f"Packet of {len(packet)} bytes exceeds MAX_PACKET_SIZE")
+        self._queue.append(bytes(packet))
+        self._wakeup.set()
+
+    def close(self):
+        """Flush any pending packets and stop the sender thread."""
+        self._stopped = True
+        self._wakeup.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            self._flush()
+            if self._stopped:
+                break
+        # Packets queued after the last flush but before the stop flag was seen (e.g. a safety stop
+        # sent right before close()) would otherwise be lost
+        self._flush()
+
+    def _flush(self):
+        while self._queue:
+            batch = []
+            while self._queue and len(batch) < self.batch_size:
+                batch.append(self._queue.popleft())
+            try:
+                if _sendmmsg is not None:
+                    self._send_batch(batch)
+                else:
+                    for packet in batch:
+                        self.sock.send(packet)
+            except ConnectionRefusedError:
+                pass  # Receiver not listening yet; keep streaming the next setpoints
+            except OSError as e:
+                print(f"UDP send error: {e}")
+
+    def _send_batch(self, batch):
+        for i, packet in enumerate(batch):
+            ctypes.memmove(self._slots[i], packet, len(packet))
+            self._iovecs[i].iov_len = len(packet)
+
+        sent = 0
+        while sent < len(batch):
+            result = _sendmmsg(self.sock.fileno(), ctypes.byref(self._msgvec[sent]), len(batch) - sent, 0)
+            if result < 0:
+                err = ctypes.get_errno()
+                if err == errno.EINTR:
+                    continue
+                raise OSError(err, os.strerror(err))
+            sent += result